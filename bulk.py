@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Render a stream of pattern jobs from a JSONL file or stdin.
+
+Each line is a JSON job giving the pattern one of three ways, plus any
+render options:
+
+    {"id": "visitor-1", "seed": 42, "outputs": ["color1"]}
+    {"id": "visitor-2", "json_file": "pattern.json", "pack_paths": true}
+    {"id": "visitor-3", "pattern": {"layers": [...]}, "precision": 2}
+
+Jobs are read one line at a time and rendered across a pool of processes
+with only a bounded number in flight, so memory use stays small for queues
+of any length; only the ids already seen are kept, to catch duplicates.
+Each job writes <id>_<output>.svg files, plus <id>.json
+for generated patterns, and one result line per job is streamed out in
+input order. A job reusing an earlier job's id fails instead of
+overwriting its files. Seeded jobs can skip designs already in a
+fingerprint index.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import fingerprint
+import generate_json
+import generate_pattern
+
+
+def run_job(job, output_dir: str, index_file: str = None):
+    """
+    Render a single job.
+
+    Seeded jobs generate a pattern that isn't in the fingerprint index at
+    index_file, when one is given.
+
+    Returns:
+        Result dictionary with the job id, "ok", the files written and any
+        error message
+    """
+    job_id = job["id"]
+    files = []
+
+    try:
+        # Generation prints progress, keep it out of the result stream
+        with contextlib.redirect_stdout(io.StringIO()):
+            if "pattern" in job:
+                pattern = job["pattern"]
+            elif "json_file" in job:
+                with open(job["json_file"], "r") as f:
+                    pattern = json.load(f)
+            elif "seed" in job:
+                random.seed(job["seed"])
+                use_row_table = job.get("row_table", False)
+                if index_file:
+                    with fingerprint.FingerprintIndex(index_file) as index:
+                        pattern = fingerprint.generate_unique_pattern(
+                            index, use_row_table=use_row_table
+                        )
+                else:
+                    pattern = generate_json.generate_pattern(
+                        use_row_table=use_row_table
+                    )
+
+                json_file = os.path.join(output_dir, f"{job_id}.json")
+                with open(json_file, "w") as f:
+                    json.dump(pattern, f, indent=2)
+                files.append(json_file)
+            else:
+                raise ValueError("Job needs a pattern, json_file or seed")
+
+            svg_content = generate_pattern.RenderedPattern(
+                pattern,
+                job.get("outputs") or generate_pattern.OUTPUTS,
+                debug=job.get("debug", False),
+                precision=job.get("precision"),
+                pack_paths=job.get("pack_paths", False),
+            )
+
+            for output in svg_content:
+                # Render before opening so a failure leaves no empty file
+                svg = svg_content[output]
+                svg_file = os.path.join(output_dir, f"{job_id}_{output}.svg")
+                with open(svg_file, "w") as f:
+                    f.write(svg)
+                files.append(svg_file)
+    except Exception as e:
+        return {"id": job_id, "ok": False, "files": files, "error": str(e)}
+
+    return {"id": job_id, "ok": True, "files": files, "error": None}
+
+
+def read_jobs(lines):
+    """
+    Parse job lines lazily, skipping blank lines.
+
+    Yields:
+        (job, error) for each line. Jobs without an id are numbered by line.
+        Lines that can't be parsed, and jobs reusing an earlier id, come
+        with an error message instead, so they still get a result in the
+        right place.
+    """
+    # The ids are the only thing kept for every job, a few bytes each
+    seen_ids = set()
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            job = json.loads(line)
+            if not isinstance(job, dict):
+                raise ValueError("job must be a JSON object")
+        except ValueError as e:
+            yield {"id": str(line_number)}, f"Invalid job: {e}"
+            continue
+
+        # Only use the last part of the id so jobs can't write elsewhere
+        job["id"] = os.path.basename(str(job.get("id", line_number)))
+        if job["id"] in seen_ids:
+            yield job, f"Duplicate job id: {job['id']}"
+            continue
+
+        seen_ids.add(job["id"])
+        yield job, None
+
+
+def render_jobs(
+    jobs, output_dir: str, workers=None, max_pending=None, index_file: str = None
+):
+    """
+    Render (job, error) pairs from read_jobs across a process pool,
+    yielding results in input order.
+
+    At most max_pending jobs (default: twice the worker count) are queued or
+    running at once; reading more jobs waits until the oldest has finished.
+    index_file is passed on to run_job.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if max_pending is None:
+        max_pending = workers * 2
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+
+    try:
+        for job, error in jobs:
+            if error is not None:
+                result = {"id": job["id"], "ok": False, "files": [], "error": error}
+            else:
+                try:
+                    result = executor.submit(run_job, job, output_dir, index_file)
+                except BrokenProcessPool:
+                    # A worker process died, the jobs it took down are
+                    # reported as failed and the rest run in a fresh pool
+                    executor.shutdown(wait=False)
+                    executor = ProcessPoolExecutor(max_workers=workers)
+                    result = executor.submit(run_job, job, output_dir, index_file)
+            pending.append((job["id"], result))
+
+            while len(pending) >= max_pending:
+                yield _result(*pending.popleft())
+
+        while pending:
+            yield _result(*pending.popleft())
+    finally:
+        executor.shutdown()
+
+
+def _result(job_id, pending):
+    """
+    Return the result of a submitted job, or an unparseable line's result.
+
+    Jobs lost when a worker process dies get a failed result of their own.
+    """
+    if isinstance(pending, dict):
+        return pending
+
+    try:
+        return pending.result()
+    except BrokenProcessPool as e:
+        return {
+            "id": job_id,
+            "ok": False,
+            "files": [],
+            "error": f"Worker process died: {e}",
+        }
+
+
+def main():
+    """Render pattern jobs from a JSONL file or stdin."""
+    parser = argparse.ArgumentParser(
+        description="Render pattern jobs from a JSONL file or stdin"
+    )
+    parser.add_argument(
+        "jobs_file",
+        nargs="?",
+        default="-",
+        help="JSONL file with one job per line (default: stdin)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        default=".",
+        help="Directory for the rendered files (default: current directory)",
+    )
+    parser.add_argument(
+        "--results",
+        default="-",
+        help="File to stream JSONL results to (default: stdout)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="Number of worker processes (default: number of CPUs)",
+    )
+    parser.add_argument(
+        "--index",
+        help="Fingerprint index file, seeded jobs skip designs already in it",
+    )
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    if args.jobs_file == "-":
+        jobs_input = contextlib.nullcontext(sys.stdin)
+    else:
+        jobs_input = open(args.jobs_file, "r")
+
+    if args.results == "-":
+        results_output = contextlib.nullcontext(sys.stdout)
+    else:
+        results_output = open(args.results, "w")
+
+    total = 0
+    failed = 0
+    with jobs_input as lines, results_output as results:
+        for result in render_jobs(
+            read_jobs(lines), args.output_dir, args.workers, index_file=args.index
+        ):
+            total += 1
+            if not result["ok"]:
+                failed += 1
+            results.write(json.dumps(result) + "\n")
+            results.flush()
+
+    print(f"Rendered {total - failed} of {total} jobs", file=sys.stderr)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Check that importing generate_pattern stays within its startup budget.
+
+Each run imports the module in a fresh interpreter with -X importtime and
+reads the cumulative time of the generate_pattern import. The fastest run
+is compared against the budget, so a busy machine doesn't cause false
+failures. Exits with status 1 when the budget is exceeded.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Import time budget for generate_pattern, in milliseconds
+STARTUP_BUDGET_MS = 30
+
+
+def import_time(module: str) -> float:
+    """Return the cumulative import time of a module in milliseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        # Import the modules next to this script whatever the working directory
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1]) / 1000
+
+    raise RuntimeError(f"No import time reported for {module}")
+
+
+def main():
+    """Time the generate_pattern import and fail if it is over budget."""
+    parser = argparse.ArgumentParser(
+        description="Check the generate_pattern import time against its budget"
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=STARTUP_BUDGET_MS,
+        help=f"Budget in milliseconds (default: {STARTUP_BUDGET_MS})",
+    )
+    parser.add_argument(
+        "--runs",
+        type=int,
+        default=5,
+        help="Number of imports to time, the fastest counts (default: 5)",
+    )
+    args = parser.parse_args()
+
+    best = min(import_time("generate_pattern") for _ in range(args.runs))
+    print(f"generate_pattern import: {best:.1f} ms (budget {args.budget:g} ms)")
+
+    if best > args.budget:
+        print("Startup budget exceeded", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
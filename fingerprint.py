@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Fingerprints for spotting visually identical patterns.
+
+Different seeds can produce the same design. A pattern's fingerprint is a
+hash of what gets drawn: every block's position, colour and segments in
+drawing order. Block IDs and the split into layers and rows are left out,
+as they don't change the picture.
+
+Fingerprints are kept in a local SQLite index so batch runs, and the
+worker, can skip designs that have already been produced.
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+
+
+def pattern_fingerprint(pattern) -> str:
+    """Return a hex fingerprint of the blocks a pattern draws."""
+    blocks = []
+
+    for layer in pattern["layers"]:
+        for row in layer["rows"]:
+            for block in row["blocks"]:
+                segments = [
+                    [segment["direction"], segment["length"]]
+                    for segment in block["segments"]
+                ]
+                blocks.append([block["x"], block["y"], block["color"], segments])
+
+    canonical = json.dumps(blocks, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class FingerprintIndex:
+    """
+    Persistent set of pattern fingerprints stored in SQLite.
+
+    Lookups use the table's primary key, so membership checks stay fast with
+    millions of stored designs. Each addition is committed straight away so
+    several processes can share one index.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout=30)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints "
+            "(fingerprint TEXT PRIMARY KEY) WITHOUT ROWID"
+        )
+        self._connection.commit()
+
+    def __contains__(self, fingerprint: str) -> bool:
+        row = self._connection.execute(
+            "SELECT 1 FROM fingerprints WHERE fingerprint = ?", (fingerprint,)
+        ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        row = self._connection.execute("SELECT COUNT(*) FROM fingerprints").fetchone()
+        return row[0]
+
+    def add(self, fingerprint: str) -> bool:
+        """Add a fingerprint, returning False if it was already in the index."""
+        with self._connection:
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO fingerprints (fingerprint) VALUES (?)",
+                (fingerprint,),
+            )
+        return cursor.rowcount == 1
+
+    def close(self):
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def generate_unique_pattern(index, use_row_table=False, max_attempts=100):
+    """
+    Generate a pattern that is not yet in the index and add it.
+
+    Duplicates are discarded and generation carries on from the current
+    random state, so a seeded run still gives the same result every time.
+
+    Raises:
+        RuntimeError: If every attempt produced a known pattern
+    """
+    import generate_json
+
+    for attempt in range(max_attempts):
+        pattern = generate_json.generate_pattern(use_row_table=use_row_table)
+        if index.add(pattern_fingerprint(pattern)):
+            return pattern
+
+        print(f"Skipping duplicate pattern (attempt {attempt + 1})")
+
+    raise RuntimeError(f"No new pattern found in {max_attempts} attempts")
+
+
+def main():
+    """Check or add pattern JSON files against a fingerprint index."""
+    parser = argparse.ArgumentParser(
+        description="Check pattern JSON files against a fingerprint index"
+    )
+    parser.add_argument("json_files", nargs="+", help="Pattern JSON files")
+    parser.add_argument(
+        "--index",
+        default="fingerprints.db",
+        help="Fingerprint index file (default: fingerprints.db)",
+    )
+    parser.add_argument(
+        "--add",
+        action="store_true",
+        help="Add new patterns to the index as well as checking them",
+    )
+    args = parser.parse_args()
+
+    with FingerprintIndex(args.index) as index:
+        for json_file in args.json_files:
+            with open(json_file, "r") as f:
+                fingerprint = pattern_fingerprint(json.load(f))
+
+            if fingerprint in index:
+                print(f"{json_file}: duplicate ({fingerprint[:12]})")
+            else:
+                if args.add:
+                    index.add(fingerprint)
+                print(f"{json_file}: new ({fingerprint[:12]})")
+
+
+if __name__ == "__main__":
+    main()
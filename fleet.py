@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Dispatch plot jobs across several AxiDraw plotters.
+
+Each job is a single SVG file, for example one colour layer of a pattern.
+Jobs are assigned to devices longest first, each going to the device that
+would finish it earliest given its estimated plot time. Devices then plot
+their queues in parallel. When a device fails its unfinished jobs are
+rebalanced across the devices that are still running.
+
+MockDevice stands in for real hardware so the scheduling can be exercised
+without any plotters connected.
+"""
+import argparse
+import math
+import threading
+import time
+from collections import deque
+
+import svg_geometry
+
+# Rough AxiDraw speeds in SVG user units per second, used for estimates only
+PEN_DOWN_SPEED = 40
+PEN_UP_SPEED = 120
+PEN_LIFT_TIME = 0.25
+
+
+class DeviceError(Exception):
+    """Raised when a plotter drops out part way through a job."""
+
+
+class AxiDrawDevice:
+    """A real AxiDraw connected on the given port or with the given name."""
+
+    def __init__(self, port: str, speed: float = 1.0):
+        self.name = port
+        self.port = port
+        self.speed = speed
+
+    def plot(self, job):
+        # Import here so the scheduler works without pyaxidraw installed
+        import plot
+
+        try:
+            plot.plot_svg(job["svg_file"], port=self.port)
+        except ConnectionError as e:
+            # Only connection and serial I/O failures mean the plotter is
+            # gone, anything else (including writing the checkpoint) fails
+            # just this job
+            raise DeviceError(f"{self.name}: {e}") from e
+
+
+class MockDevice:
+    """
+    A fake plotter for exercising the scheduler.
+
+    Plotting sleeps for the job's estimate scaled by time_scale. Set
+    fail_after to make the device drop out on that many-th job.
+    """
+
+    def __init__(self, name: str, speed: float = 1.0, fail_after=None, time_scale=0):
+        self.name = name
+        self.speed = speed
+        self.fail_after = fail_after
+        self.time_scale = time_scale
+        self.plotted = []
+
+    def plot(self, job):
+        if self.fail_after is not None and len(self.plotted) + 1 >= self.fail_after:
+            raise DeviceError(f"{self.name}: device disconnected")
+
+        time.sleep(job["estimate"] * self.time_scale / self.speed)
+        self.plotted.append(job["name"])
+
+
+def discover_devices():
+    """Return an AxiDrawDevice for every connected plotter."""
+    import plot
+
+    return [AxiDrawDevice(port) for port in plot.list_ports()]
+
+
+def estimate_plot_time(svg_file: str) -> float:
+    """Estimate how many seconds an SVG file takes to plot."""
+    seconds = 0.0
+    position = (0, 0)
+
+    try:
+        polylines = svg_geometry.svg_polylines(svg_file)
+    except svg_geometry.UnsupportedSVGError:
+        # Plotted whole by pyaxidraw, so use its own estimate
+        import plot
+
+        return plot.preview_time(svg_file)
+
+    for points in polylines:
+        if len(points) < 2:
+            continue
+
+        # Travel to the start with the pen up, then draw with the pen down
+        seconds += math.dist(position, points[0]) / PEN_UP_SPEED + PEN_LIFT_TIME
+        for start, end in zip(points, points[1:]):
+            seconds += math.dist(start, end) / PEN_DOWN_SPEED
+        position = points[-1]
+
+    return seconds
+
+
+def make_job(svg_file: str, estimate=None):
+    """Create a job for an SVG file, estimating its plot time if not given."""
+    if estimate is None:
+        estimate = estimate_plot_time(svg_file)
+
+    return {"name": svg_file, "svg_file": svg_file, "estimate": estimate}
+
+
+def plan_jobs(jobs, devices, loads=None):
+    """
+    Assign jobs to devices, balancing the estimated time each one plots for.
+
+    Jobs are placed longest first on whichever device would finish them
+    soonest, taking each device's relative speed and any existing load in
+    seconds into account.
+
+    Returns:
+        Dictionary of device name to the list of jobs assigned to it
+    """
+    loads = dict(loads or {})
+    plan = {device.name: [] for device in devices}
+
+    for job in sorted(jobs, key=lambda job: job["estimate"], reverse=True):
+
+        def finish_time(device):
+            return loads.get(device.name, 0) + job["estimate"] / device.speed
+
+        device = min(devices, key=finish_time)
+        plan[device.name].append(job)
+        loads[device.name] = finish_time(device)
+
+    return plan
+
+
+def dispatch(jobs, devices):
+    """
+    Plot jobs across devices in parallel.
+
+    Each device runs in its own thread working through its planned queue.
+    If a device raises DeviceError, it is dropped and its current and
+    queued jobs are planned again across the remaining devices; those jobs
+    are only reported as failed once every device has dropped out. Any
+    other error fails just that job and the device carries on.
+
+    Returns:
+        List of result dictionaries with the job name, status, device and
+        error for each job, in the order the jobs were given
+    """
+    if not devices:
+        raise ValueError("No plotters available")
+
+    names = [device.name for device in devices]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate plotters: {', '.join(duplicates)}")
+
+    # Track jobs by position so the same file can be plotted more than once
+    jobs = [dict(job, index=index) for index, job in enumerate(jobs)]
+
+    queues = {
+        name: deque(planned) for name, planned in plan_jobs(jobs, devices).items()
+    }
+    busy = {device.name: False for device in devices}
+    alive = list(devices)
+    results = {}
+    condition = threading.Condition()
+
+    def others_have_work(name):
+        return any(
+            busy[device.name] or queues[device.name]
+            for device in alive
+            if device.name != name
+        )
+
+    def worker(device):
+        while True:
+            with condition:
+                # Wait for rebalanced work while another device could still fail
+                while not queues[device.name] and others_have_work(device.name):
+                    condition.wait()
+                if not queues[device.name]:
+                    condition.notify_all()
+                    return
+                job = queues[device.name].popleft()
+                busy[device.name] = True
+
+            print(f"{device.name}: plotting {job['name']}")
+            result = None
+            try:
+                device.plot(job)
+                result = {
+                    "job": job["name"],
+                    "status": "done",
+                    "device": device.name,
+                    "error": None,
+                }
+            except DeviceError as e:
+                with condition:
+                    print(f"{device.name}: dropped out ({e})")
+                    alive.remove(device)
+
+                    orphans = [job] + list(queues[device.name])
+                    queues[device.name].clear()
+
+                    if alive:
+                        loads = {
+                            other.name: sum(j["estimate"] for j in queues[other.name])
+                            / other.speed
+                            for other in alive
+                        }
+                        for name, planned in plan_jobs(orphans, alive, loads).items():
+                            queues[name].extend(planned)
+                    else:
+                        for orphan in orphans:
+                            results[orphan["index"]] = {
+                                "job": orphan["name"],
+                                "status": "failed",
+                                "device": None,
+                                "error": str(e),
+                            }
+                return
+            except Exception as e:
+                # The job itself is at fault, another device would fail too
+                print(f"{device.name}: failed {job['name']} ({e})")
+                result = {
+                    "job": job["name"],
+                    "status": "failed",
+                    "device": device.name,
+                    "error": str(e),
+                }
+            finally:
+                with condition:
+                    busy[device.name] = False
+                    if result is not None:
+                        results[job["index"]] = result
+                    condition.notify_all()
+
+    threads = [threading.Thread(target=worker, args=(device,)) for device in devices]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    not_plotted = {"status": "failed", "device": None, "error": "Not plotted"}
+    return [
+        results.get(job["index"], dict(not_plotted, job=job["name"])) for job in jobs
+    ]
+
+
+def main():
+    """Plot SVG files across several AxiDraw plotters."""
+    parser = argparse.ArgumentParser(
+        description="Plot SVG files across several AxiDraw plotters"
+    )
+    parser.add_argument("svg_files", nargs="+", help="SVG files to plot")
+    parser.add_argument(
+        "--port",
+        action="append",
+        dest="ports",
+        help="AxiDraw port or name to use, repeat for each plotter "
+        "(default: all connected plotters)",
+    )
+    parser.add_argument(
+        "--mock",
+        type=int,
+        metavar="COUNT",
+        help="Use COUNT mock plotters instead of real hardware",
+    )
+    parser.add_argument(
+        "--plan-only",
+        action="store_true",
+        help="Print the job assignment without plotting",
+    )
+    args = parser.parse_args()
+
+    if args.mock:
+        devices = [MockDevice(f"mock{i + 1}") for i in range(args.mock)]
+    elif args.ports:
+        if len(set(args.ports)) != len(args.ports):
+            parser.error("each --port can only be given once")
+        devices = [AxiDrawDevice(port) for port in args.ports]
+    else:
+        devices = discover_devices()
+
+    if not devices:
+        print("No plotters found")
+        return
+
+    # Files that can't be read or estimated fail without stopping the others
+    jobs = []
+    failed = {}
+    for index, svg_file in enumerate(args.svg_files):
+        try:
+            jobs.append(make_job(svg_file))
+        except Exception as e:
+            failed[index] = {
+                "job": svg_file,
+                "status": "failed",
+                "device": None,
+                "error": str(e),
+            }
+
+    if args.plan_only:
+        for result in failed.values():
+            print(f"{result['job']}: failed ({result['error']})")
+        for name, planned in plan_jobs(jobs, devices).items():
+            total = sum(job["estimate"] for job in planned)
+            print(f"{name}: {len(planned)} jobs, ~{total:.0f}s")
+            for job in planned:
+                print(f"  {job['name']} (~{job['estimate']:.0f}s)")
+        return
+
+    dispatched = iter(dispatch(jobs, devices) if jobs else [])
+    results = [
+        failed[index] if index in failed else next(dispatched)
+        for index in range(len(args.svg_files))
+    ]
+    for result in results:
+        if result["status"] == "done":
+            print(f"{result['job']}: plotted on {result['device']}")
+        else:
+            print(f"{result['job']}: failed ({result['error']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 import json
+import os
 import random
 import argparse
 
@@ -65,74 +66,106 @@ def main():
     parser.add_argument(
         "-s", "--seed", type=int, help="Random seed for reproducible patterns"
     )
+    parser.add_argument(
+        "--row-table",
+        action="store_true",
+        help="Sample whole rows from the precomputed row table",
+    )
+    parser.add_argument(
+        "-n",
+        "--count",
+        type=int,
+        default=1,
+        help="Number of patterns to generate, saved as <output>_1.json and so on",
+    )
+    parser.add_argument(
+        "--index",
+        help="Fingerprint index file used to skip patterns generated before",
+    )
     args = parser.parse_args()
 
     # Set random seed if provided
     if args.seed is not None:
         random.seed(args.seed)
 
-    # Generate the pattern
-    pattern = generate_pattern()
+    index = None
+    if args.index:
+        import fingerprint
 
-    # Save to file
-    with open(args.output, "w") as f:
-        json.dump(pattern, f, indent=2)
+        index = fingerprint.FingerprintIndex(args.index)
 
-    # Count statistics
-    total_blocks = 0
-    purple_count = 0
-    cyan_count = 0
+    for pattern_number in range(1, args.count + 1):
+        output = args.output
+        if args.count > 1:
+            base, ext = os.path.splitext(args.output)
+            output = f"{base}_{pattern_number}{ext}"
 
-    for layer in pattern["layers"]:
-        for row in layer["rows"]:
-            for block in row["blocks"]:
-                total_blocks += 1
-                if block["color"] == "purple":
-                    purple_count += 1
-                else:
-                    cyan_count += 1
+        # Generate the pattern, skipping any already in the index
+        if index is not None:
+            pattern = fingerprint.generate_unique_pattern(
+                index, use_row_table=args.row_table
+            )
+        else:
+            pattern = generate_pattern(use_row_table=args.row_table)
+
+        # Save to file
+        with open(output, "w") as f:
+            json.dump(pattern, f, indent=2)
+
+        # Count statistics
+        total_blocks = 0
+        purple_count = 0
+        cyan_count = 0
+
+        for layer in pattern["layers"]:
+            for row in layer["rows"]:
+                for block in row["blocks"]:
+                    total_blocks += 1
+                    if block["color"] == "purple":
+                        purple_count += 1
+                    else:
+                        cyan_count += 1
+
+        print(f"Generated pattern saved to {output}")
+        print(f"Total blocks: {total_blocks}")
+        print(
+            f"Purple blocks: {purple_count} ({purple_count / total_blocks * 100:.1f}%)"
+        )
+        print(f"Cyan blocks: {cyan_count} ({cyan_count / total_blocks * 100:.1f}%)")
+        print(f"Layers: {len(pattern['layers'])}")
+
+    if index is not None:
+        index.close()
 
-    print(f"Generated pattern saved to {args.output}")
-    print(f"Total blocks: {total_blocks}")
-    print(f"Purple blocks: {purple_count} ({purple_count / total_blocks * 100:.1f}%)")
-    print(f"Cyan blocks: {cyan_count} ({cyan_count / total_blocks * 100:.1f}%)")
-    print(f"Layers: {len(pattern['layers'])}")
 
+def generate_pattern(use_row_table=False):
+    """
+    Generate the complete pattern according to the rules.
 
-def generate_pattern():
-    """Generate the complete pattern according to the rules."""
+    With use_row_table, each row is drawn in one step from the precomputed
+    table of every possible row in row_table. The rows follow exactly the
+    same distribution, but a given seed produces a different pattern.
+    """
     layer1_rows = []
     block_id_counter = 1
 
-    # Starting position
-    current_x = -10
-    current_y = 60
+    if use_row_table:
+        import row_table
 
-    row_count = 0
+        row_generator = row_table.generate_row_blocks
+    else:
+        row_generator = generate_row_blocks
 
-    while True:
+    for row_count, (current_x, current_y) in enumerate(row_start_positions()):
         print(f"Generating row {row_count} at position ({current_x}, {current_y})")
 
         # Generate blocks for this row
-        blocks, block_id_counter = generate_row_blocks(
+        blocks, block_id_counter = row_generator(
             current_x, current_y, block_id_counter
         )
 
         layer1_rows.append({"blocks": blocks})
 
-        if current_y > 360 and current_x == -10:
-            current_x = 52
-            current_y = 400
-        elif current_y == 400:
-            current_x += 80
-        else:
-            current_y += 80
-
-        if current_x > 260 and current_y > 360:
-            break
-
-        row_count += 1
-
     # Separate layers: extract rows with single blocks to layer 2
     layer1_final = []
     layer2_rows = []
@@ -163,6 +196,27 @@ def generate_pattern():
     return pattern
 
 
+def row_start_positions():
+    """Yield the start position of each row, in generation order."""
+    # Starting position
+    current_x = -10
+    current_y = 60
+
+    while True:
+        yield current_x, current_y
+
+        if current_y > 360 and current_x == -10:
+            current_x = 52
+            current_y = 400
+        elif current_y == 400:
+            current_x += 80
+        else:
+            current_y += 80
+
+        if current_x > 260 and current_y > 360:
+            break
+
+
 def generate_row_blocks(start_x, start_y, block_id_counter):
     """Generate blocks for a single row."""
     blocks = []
@@ -202,33 +256,12 @@ def generate_row_blocks(start_x, start_y, block_id_counter):
         block = generate_block(block_id_counter, direction, num_segments, is_last_block)
 
         # Set the start position
-        if i > 0 and blocks[i - 1]["segments"][0]["direction"] == "northeast":
-            if block["segments"][0]["direction"] == "northeast":
-                x_adjust = 0
-                y_adjust = 0
-
-                # Adjust gap if the previous block had a single segment
-                # As there is no corner
-                if len(blocks[i - 1]["segments"]) == 1:
-                    x_adjust = -4
-                    y_adjust = +4
-
-                prev_len = blocks[i - 1]["segments"][0]["length"]
-                current_x += LENGTH_POSITION_CHANGES_NE[prev_len][0] + x_adjust
-                current_y += LENGTH_POSITION_CHANGES_NE[prev_len][1] + y_adjust
-            else:  # southeast
-                prev_len = blocks[i - 1]["segments"][0]["length"]
-                current_x += LENGTH_POSITION_CHANGES_SE[prev_len][0]
-                current_y += LENGTH_POSITION_CHANGES_SE[prev_len][1]
-        elif i > 0 and blocks[i - 1]["segments"][0]["direction"] == "southeast":
-            if block["segments"][0]["direction"] == "northeast":
-                prev_len = blocks[i - 1]["segments"][0]["length"]
-                current_x += 4
-                current_y += -4
-            else:  # southeast
-                prev_len = blocks[i - 1]["segments"][0]["length"]
-                current_x += 40
-                current_y += -40
+        if i > 0:
+            x_change, y_change = block_offset(
+                blocks[i - 1]["segments"], block["segments"][0]["direction"]
+            )
+            current_x += x_change
+            current_y += y_change
 
         block["x"] = current_x
         block["y"] = current_y
@@ -238,6 +271,38 @@ def generate_row_blocks(start_x, start_y, block_id_counter):
     return blocks, block_id_counter
 
 
+def block_offset(previous_segments, direction):
+    """
+    Return the (x, y) change from the previous block's start position to the
+    start of the next block, which begins in the given direction.
+    """
+    previous_direction = previous_segments[0]["direction"]
+    prev_len = previous_segments[0]["length"]
+
+    if previous_direction == "northeast":
+        if direction == "northeast":
+            x_adjust = 0
+            y_adjust = 0
+
+            # Adjust gap if the previous block had a single segment
+            # As there is no corner
+            if len(previous_segments) == 1:
+                x_adjust = -4
+                y_adjust = +4
+
+            return (
+                LENGTH_POSITION_CHANGES_NE[prev_len][0] + x_adjust,
+                LENGTH_POSITION_CHANGES_NE[prev_len][1] + y_adjust,
+            )
+        else:  # southeast
+            return LENGTH_POSITION_CHANGES_SE[prev_len]
+    else:  # southeast
+        if direction == "northeast":
+            return 4, -4
+        else:  # southeast
+            return 40, -40
+
+
 def generate_block(block_id, direction, num_segments, is_last_block=False):
     """Generate a single block."""
 
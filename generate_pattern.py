@@ -1,18 +1,15 @@
 #!/usr/bin/env python3
+from collections.abc import Mapping
 from typing import Dict
-import svgwrite
 import math
 import json
 import argparse
+import os
 import generate_json
+import path_encoding
 
-# Optional import for plotting
-try:
-    import plot
-
-    PLOT_AVAILABLE = True
-except ImportError:
-    PLOT_AVAILABLE = False
+# svgwrite and the optional plot module are imported where they are used so
+# runs that don't render or plot don't pay for loading them
 
 scale = 1.5
 
@@ -24,50 +21,59 @@ colors = {"purple": "#B596C8", "cyan": "#63C3DC", "white": "#FFFFFF"}
 pipe_width = 6
 
 
-def collect_block_paths(x, y, segments):
-    """Collect all pipe paths for a block to use in masking."""
-    paths = []
-    pipes = 7
+def pipe_points(x, y, segments, pipe):
+    """Calculate the polyline points for a single pipe within a block."""
+    offset_angle = angles[segments[0]["direction"]] + math.radians(90)
 
-    for pipe_index in range(pipes):
-        offset_angle = angles[segments[0]["direction"]] + math.radians(90)
+    # Calculate offset position along perpendicular direction
+    start_x = x - (pipe * pipe_width) * math.cos(offset_angle)
+    start_y = y + (pipe * pipe_width) * math.sin(offset_angle)
 
-        # Calculate offset position along perpendicular direction
-        start_x = x - (pipe_index * pipe_width) * math.cos(offset_angle)
-        start_y = y + (pipe_index * pipe_width) * math.sin(offset_angle)
+    points = [(start_x, start_y)]
 
-        points = [(start_x, start_y)]
+    # Calculate path points for each segment
+    for i, segment in enumerate(segments):
+        length = segment["length"]
+        angle = angles[segment["direction"]]
+        offset = 0
 
-        # Calculate path points for each segment
-        for i, segment in enumerate(segments):
-            length = segment["length"]
-            angle = angles[segment["direction"]]
+        # For the first segment, offset in the positive direction
+        # For the last segment, reverse the offset direction
+        # For all other segments, no offset
+        if i == 0 and len(segments) == 1:
             offset = 0
+        elif i == 0 and len(segments) > 1:
+            offset = pipe * pipe_width
+        elif i == len(segments) - 1:
+            offset = -(pipe * pipe_width)
 
-            if i == 0 and len(segments) == 1:
-                offset = 0
-            elif i == 0 and len(segments) > 1:
-                offset = pipe_index * pipe_width
-            elif i == len(segments) - 1:
-                offset = -(pipe_index * pipe_width)
-
-            # Calculate end point of the segment
-            if segment["direction"] == "southeast":
-                end_x = points[i][0] + (length + offset) * math.cos(angle)
-                end_y = points[i][1] - (length + offset) * math.sin(angle)
-            else:
-                end_x = points[i][0] + (length - offset) * math.cos(angle)
-                end_y = points[i][1] - (length - offset) * math.sin(angle)
+        # Calculate end point of the segment
+        if segment["direction"] == "southeast":
+            end_x = points[i][0] + (length + offset) * math.cos(angle)
+            end_y = points[i][1] - (length + offset) * math.sin(angle)
+        else:
+            end_x = points[i][0] + (length - offset) * math.cos(angle)
+            end_y = points[i][1] - (length - offset) * math.sin(angle)
 
-            points.append((end_x, end_y))
+        points.append((end_x, end_y))
 
-        paths.append(points)
+    return points
 
-    return paths
 
+def collect_block_paths(x, y, segments):
+    """Collect all pipe paths for a block to use in masking."""
+    pipes = 7
 
-def create_mask_definition(dwg, mask_id, paths_to_mask):
-    """Create a mask definition to prevent overlap between colors."""
+    return [pipe_points(x, y, segments, pipe_index) for pipe_index in range(pipes)]
+
+
+def create_mask_definition(dwg, mask_id, paths_to_mask, precision=None, pack=False):
+    """
+    Create a mask definition to prevent overlap between colors.
+
+    With pack set, all masked paths share a single `<path>` element, as they
+    are all stroked the same way the result is identical.
+    """
     if not paths_to_mask:
         return None
 
@@ -77,175 +83,247 @@ def create_mask_definition(dwg, mask_id, paths_to_mask):
     # White background (everything visible by default)
     mask.add(dwg.rect(insert=(0, 0), size=(width, height), fill="white"))
 
+    mask_params = {
+        "stroke": "black",
+        "stroke_width": pipe_width,
+        "fill": "none",
+        "stroke_linejoin": "round",
+        "stroke_linecap": "square",
+    }
+
+    if pack:
+        d = path_encoding.path_data(paths_to_mask, precision)
+        mask.add(dwg.path(d=d, **mask_params))
+        return mask_id
+
     # Black paths (areas to be masked out/subtracted)
     for path_points in paths_to_mask:
+        if precision is not None:
+            path_points = path_encoding.simplify_points(path_points, precision)
         if len(path_points) > 1:
-            mask.add(
-                dwg.polyline(
-                    points=path_points,
-                    stroke="black",
-                    stroke_width=pipe_width,
-                    fill="none",
-                    stroke_linejoin="round",
-                    stroke_linecap="square",
-                )
-            )
+            mask.add(dwg.polyline(points=path_points, **mask_params))
 
     return mask_id
 
 
-def create_pattern(data_file: str, debug: bool = False) -> Dict:
-    """
-    Create an SVG with a single chevron starting from southwest corner,
-    going northeast then turning southeast.
+# Names of the SVG outputs that create_pattern can render
+OUTPUTS = ("color1", "color2", "combined")
 
-    Args:
-        data_file: Path to the JSON data file
-        debug: Whether to show grid and ID numbers
+# Block colour drawn by each single colour output (combined draws all of them)
+OUTPUT_COLORS = {"color1": "purple", "color2": "cyan"}
 
-    Returns:
-        Dictionary with 3 SVGs for each color and combined
+
+def iter_blocks(data):
+    """Yield every block of a pattern in drawing order."""
+    for layer in data["layers"]:
+        for row in layer["rows"]:
+            yield from row["blocks"]
+
+
+class RenderedPattern(Mapping):
     """
+    Read-only mapping of output name to SVG string, rendered on first access.
 
-    # Create SVG drawing
-    color1 = svgwrite.Drawing(size=(width, height))
-    color2 = svgwrite.Drawing(size=(width, height))
-    combined = svgwrite.Drawing(size=(width, height))
+    Only the outputs requested when it was created are available, and each
+    one only builds the geometry and masks it needs. The purple paths used
+    for the cyan mask are computed once and shared.
 
-    # Add white background
-    color1.add(color1.rect(insert=(0, 0), size=(width, height), fill="white"))
-    color2.add(color2.rect(insert=(0, 0), size=(width, height), fill="white"))
-    combined.add(combined.rect(insert=(0, 0), size=(width, height), fill="white"))
+    When precision is set, coordinates are rounded to that many decimal
+    places; with pack_paths each block's pipes of one colour are written as
+    a single `<path>` using relative commands.
+    """
 
-    # Load the data from JSON file
-    with open(data_file, "r") as file:
-        data = json.load(file)
+    def __init__(
+        self,
+        data: Dict,
+        outputs,
+        debug: bool = False,
+        precision=None,
+        pack_paths: bool = False,
+    ):
+        unknown = [output for output in outputs if output not in OUTPUTS]
+        if unknown:
+            raise ValueError(f"Unknown outputs: {', '.join(unknown)}")
+        if precision is not None and precision < 0:
+            raise ValueError(f"Precision must be 0 or more, not {precision}")
+
+        self._data = data
+        self._outputs = tuple(outputs)
+        self._debug = debug
+        if pack_paths and precision is None:
+            precision = path_encoding.DEFAULT_PRECISION
+        self._precision = precision
+        self._pack_paths = pack_paths
+        self._cache = {}
+        self._purple_paths = None
+        self._block_id_positions = None
+
+    def __getitem__(self, output):
+        if output not in self._outputs:
+            raise KeyError(output)
+        if output not in self._cache:
+            self._cache[output] = self._render(output).tostring()
+        return self._cache[output]
+
+    def __iter__(self):
+        return iter(self._outputs)
+
+    def __len__(self):
+        return len(self._outputs)
+
+    def purple_paths(self):
+        """Pipe paths of all purple blocks, used to mask the cyan layer."""
+        if self._purple_paths is None:
+            self._purple_paths = []
+            for block in iter_blocks(self._data):
+                if block["color"] == "purple":
+                    self._purple_paths.extend(
+                        collect_block_paths(block["x"], block["y"], block["segments"])
+                    )
+        return self._purple_paths
 
-    # Store block information for ID drawing later
-    block_ids = []
+    def block_id_positions(self):
+        """
+        Label positions for block IDs in debug mode.
 
-    # Track paths for masking
-    purple_paths = []
-    cyan_paths = []
+        Positions are resolved across every block so each output places its
+        labels exactly where the combined view does.
+        """
+        if self._block_id_positions is None:
+            # Track used positions to avoid overlaps
+            used_positions = {}
+            self._block_id_positions = []
 
-    for layer in data["layers"]:
-        # New format with rows (logical grouping)
-        for row in layer["rows"]:
-            for block in row["blocks"]:
-                # Get block ID if it exists
+            for block in iter_blocks(self._data):
                 block_id = block.get("id", None)
-                block_x = block["x"]
-                block_y = block["y"]
-
-                # Store block info for later ID drawing
-                if block_id is not None:
-                    block_ids.append(
-                        {
-                            "id": block_id,
-                            "x": block_x,
-                            "y": block_y,
-                            "color": block["color"],
-                        }
-                    )
+                if block_id is None:
+                    continue
 
-                # Collect paths for masking
-                paths = collect_block_paths(block_x, block_y, block["segments"])
-                if block["color"] == "purple":
-                    purple_paths.extend(paths)
-                elif block["color"] == "cyan":
-                    cyan_paths.extend(paths)
+                # Calculate base position
+                x, y = block["x"], block["y"]
+                base_x = 10 if x < 0 else x
+                base_y = 400 if y > 400 else y
 
-    # Create mask definition - only mask cyan to avoid purple paths
-    cyan_mask_id = create_mask_definition(color2, "cyanMask", purple_paths)
+                # Find available position near the base position
+                text_x, text_y = find_available_position(
+                    used_positions, base_x, base_y
+                )
+                used_positions[(text_x, text_y)] = block_id
 
-    transform_scale = f"scale({scale})"
+                self._block_id_positions.append(
+                    (text_x, text_y, block_id, block["color"])
+                )
+        return self._block_id_positions
 
-    # Create groups - purple without mask, cyan with mask
-    purple_group = color1.g(transform=transform_scale)
-    color1.add(purple_group)
+    def _render(self, output):
+        import svgwrite
 
-    cyan_group = color2.g(transform=transform_scale)
-    if cyan_mask_id:
-        cyan_group.attribs["mask"] = f"url(#{cyan_mask_id})"
-    color2.add(cyan_group)
+        color = OUTPUT_COLORS.get(output)
+
+        # Create SVG drawing with a white background
+        dwg = svgwrite.Drawing(size=(width, height))
+        dwg.add(dwg.rect(insert=(0, 0), size=(width, height), fill="white"))
+
+        # Create mask definition - only mask cyan to avoid purple paths
+        mask_id = None
+        if color == "cyan":
+            mask_id = create_mask_definition(
+                dwg,
+                "cyanMask",
+                self.purple_paths(),
+                precision=self._precision,
+                pack=self._pack_paths,
+            )
 
-    combined_group = combined.g(transform=transform_scale)
-    combined.add(combined_group)
+        group = dwg.g(transform=f"scale({scale})")
+        if mask_id:
+            group.attribs["mask"] = f"url(#{mask_id})"
+        dwg.add(group)
 
-    # Draw all blocks
-    for layer in data["layers"]:
-        for row in layer["rows"]:
-            for block in row["blocks"]:
+        # Draw all blocks for this output
+        for block in iter_blocks(self._data):
+            if color is not None and block["color"] != color:
+                continue
+
+            if self._pack_paths:
+                drawpipe_group_packed(
+                    group,
+                    block["x"],
+                    block["y"],
+                    block["segments"],
+                    block["color"],
+                    self._precision,
+                )
+            elif color is None:
                 drawpipe_group(
-                    combined_group,
+                    group,
                     block["x"],
                     block["y"],
                     block["segments"],
                     block["color"],
+                    self._precision,
+                )
+            else:
+                drawpipe_group_to_element(
+                    group,
+                    block["x"],
+                    block["y"],
+                    block["segments"],
+                    block["color"],
+                    self._precision,
                 )
 
-                if block["color"] == "purple":
-                    drawpipe_group_to_element(
-                        purple_group,
-                        block["x"],
-                        block["y"],
-                        block["segments"],
-                        block["color"],
-                    )
-                elif block["color"] == "cyan":
-                    drawpipe_group_to_element(
-                        cyan_group,
-                        block["x"],
-                        block["y"],
-                        block["segments"],
-                        block["color"],
+        # Add white border as the last element
+        add_border(dwg, width, height)
+
+        # Add grid overlay and IDs only in debug mode
+        if self._debug:
+            add_grid(dwg, width, height)
+
+            # Draw IDs last so they appear on top of everything
+            for text_x, text_y, block_id, block_color in self.block_id_positions():
+                if color is None or block_color == color:
+                    draw_block_id_at_position(
+                        dwg, text_x, text_y, block_id, block_color
                     )
 
-    # Add white border as the last element
-    add_border(color1, width, height)
-    add_border(color2, width, height)
-    add_border(combined, width, height)
+        return dwg
 
-    # Add grid overlay and IDs only in debug mode
-    if debug:
-        add_grid(color1, width, height)
-        add_grid(color2, width, height)
-        add_grid(combined, width, height)
-
-        # Draw IDs last so they appear on top of everything
-        # Track used positions to avoid overlaps
-        used_positions = {}
-
-        for block_info in block_ids:
-            # Calculate base position
-            x, y = block_info["x"], block_info["y"]
-            base_x = 10 if x < 0 else x
-            base_y = 400 if y > 400 else y
-
-            # Find available position near the base position
-            text_x, text_y = find_available_position(used_positions, base_x, base_y)
-            used_positions[(text_x, text_y)] = block_info["id"]
-
-            draw_block_id_at_position(
-                combined, text_x, text_y, block_info["id"], block_info["color"]
-            )
-            if block_info["color"] == "purple":
-                draw_block_id_at_position(
-                    color1, text_x, text_y, block_info["id"], block_info["color"]
-                )
-            elif block_info["color"] == "cyan":
-                draw_block_id_at_position(
-                    color2, text_x, text_y, block_info["id"], block_info["color"]
-                )
 
-    return {
-        "color1": color1.tostring(),
-        "color2": color2.tostring(),
-        "combined": combined.tostring(),
-    }
+def create_pattern(
+    data_file: str,
+    debug: bool = False,
+    outputs=None,
+    precision=None,
+    pack_paths: bool = False,
+) -> Mapping:
+    """
+    Create an SVG with a single chevron starting from southwest corner,
+    going northeast then turning southeast.
 
+    Args:
+        data_file: Path to the JSON data file
+        debug: Whether to show grid and ID numbers
+        outputs: Names of the SVGs to render (default: all of OUTPUTS)
+        precision: Decimal places to round coordinates to (default: full)
+        pack_paths: Whether to pack each block's pipes into `<path>` data
 
-def drawpipe_group(dwg, x, y, segments, color):
+    Returns:
+        Mapping of the requested outputs to SVGs, each rendered on first access
+    """
+    if outputs is None:
+        outputs = OUTPUTS
+
+    # Load the data from JSON file
+    with open(data_file, "r") as file:
+        data = json.load(file)
+
+    return RenderedPattern(
+        data, outputs, debug=debug, precision=precision, pack_paths=pack_paths
+    )
+
+
+def drawpipe_group(dwg, x, y, segments, color, precision=None):
     last_positions = []
     pipes = 7
 
@@ -260,6 +338,7 @@ def drawpipe_group(dwg, x, y, segments, color):
             segments,
             i,
             draw_color,
+            precision,
         )
 
         # Alternate between white and the specified color
@@ -271,7 +350,7 @@ def drawpipe_group(dwg, x, y, segments, color):
     return last_positions
 
 
-def drawpipe_group_to_element(element, x, y, segments, color):
+def drawpipe_group_to_element(element, x, y, segments, color, precision=None):
     """Draw pipe group to a specific element (like a masked group)."""
     pipes = 7
     draw_color = colors[color]
@@ -284,6 +363,7 @@ def drawpipe_group_to_element(element, x, y, segments, color):
             segments,
             i,
             draw_color,
+            precision,
         )
 
         # Alternate between white and the specified color
@@ -293,42 +373,51 @@ def drawpipe_group_to_element(element, x, y, segments, color):
             draw_color = colors[color]
 
 
-def drawpipe(dwg, x, y, segments, pipe, color):
-    """Draw a pipe shape with two segments and rounded joint."""
+def drawpipe_group_packed(element, x, y, segments, color, precision):
+    """
+    Draw a pipe group as one `<path>` per stroke colour.
 
-    offset_angle = angles[segments[0]["direction"]] + math.radians(90)
+    Pipes within a block never overlap, so drawing all coloured pipes before
+    all white ones looks the same as alternating them. Blocks are still drawn
+    one after another to keep the overlap between blocks unchanged.
+    """
+    import svgwrite
 
-    # Calculate offset position along perpendicular direction
-    start_x = x - (pipe * pipe_width) * math.cos(offset_angle)
-    start_y = y + (pipe * pipe_width) * math.sin(offset_angle)
+    pipes = 7
+    paths = {colors[color]: [], colors["white"]: []}
+    draw_color = colors[color]
 
-    points = [(start_x, start_y)]
+    for i in range(pipes):
+        paths[draw_color].append(pipe_points(x, y, segments, i))
 
-    # First segment using direction_1
-    for i, segment in enumerate(segments):
-        length = segment["length"]
-        angle = angles[segment["direction"]]
-        offset = 0
+        # Alternate between white and the specified color
+        if draw_color != colors["white"]:
+            draw_color = colors["white"]
+        else:
+            draw_color = colors[color]
 
-        # For the first segment, offset in the positive direction
-        # For the last segment, reverse the offset direction
-        # For all other segments, no offset
-        if i == 0 and len(segments) == 1:
-            offset = 0
-        elif i == 0 and len(segments) > 1:
-            offset = pipe * pipe_width
-        elif i == len(segments) - 1:
-            offset = -(pipe * pipe_width)
+    for draw_color, color_paths in paths.items():
+        path_params = {
+            "d": path_encoding.path_data(color_paths, precision),
+            "stroke": draw_color,
+            "stroke_width": pipe_width,
+            "fill": "none",
+        }
 
-        # Calculate end point of the segment
-        if segment["direction"] == "southeast":
-            end_x = points[i][0] + (length + offset) * math.cos(angle)
-            end_y = points[i][1] - (length + offset) * math.sin(angle)
-        else:
-            end_x = points[i][0] + (length - offset) * math.cos(angle)
-            end_y = points[i][1] - (length - offset) * math.sin(angle)
+        # Only add stroke_linejoin if we have a second segment
+        if len(segments) > 1:
+            path_params["stroke_linejoin"] = "round"
+            path_params["stroke_linecap"] = "square"
+
+        element.add(svgwrite.path.Path(**path_params))
 
-        points.append((end_x, end_y))
+
+def drawpipe(dwg, x, y, segments, pipe, color, precision=None):
+    """Draw a pipe shape with two segments and rounded joint."""
+
+    points = pipe_points(x, y, segments, pipe)
+    if precision is not None:
+        points = path_encoding.simplify_points(points, precision)
 
     # Build parameters dictionary
     polyline_params = {
@@ -452,6 +541,102 @@ def add_grid(dwg, width, height, spacing=20):
         dwg.add(dwg.text(str(y), insert=(5, y), font_size="8", fill="red"))
 
 
+def generate_json_file(
+    json_file: str, seed=None, use_row_table=False, index_file=None
+) -> Dict:
+    """
+    Generate a new pattern, save it to a JSON file and print statistics.
+
+    With index_file, patterns already in that fingerprint index are skipped
+    and the new pattern is added to it.
+    """
+    import random
+
+    # Set random seed if provided
+    if seed is not None:
+        random.seed(seed)
+
+    # Generate the pattern
+    print("Generating JSON pattern...")
+    if index_file:
+        import fingerprint
+
+        with fingerprint.FingerprintIndex(index_file) as index:
+            pattern = fingerprint.generate_unique_pattern(
+                index, use_row_table=use_row_table
+            )
+    else:
+        pattern = generate_json.generate_pattern(use_row_table=use_row_table)
+
+    # Save to file
+    with open(json_file, "w") as f:
+        json.dump(pattern, f, indent=2)
+
+    # Count statistics
+    total_blocks = 0
+    purple_count = 0
+    cyan_count = 0
+
+    for layer in pattern["layers"]:
+        for row in layer["rows"]:
+            for block in row["blocks"]:
+                total_blocks += 1
+                if block["color"] == "purple":
+                    purple_count += 1
+                else:
+                    cyan_count += 1
+
+    print(f"Generated pattern saved to {json_file}")
+    print(f"Total blocks: {total_blocks}")
+    print(f"Purple blocks: {purple_count} ({purple_count / total_blocks * 100:.1f}%)")
+    print(f"Cyan blocks: {cyan_count} ({cyan_count / total_blocks * 100:.1f}%)")
+    print(f"Layers: {len(pattern['layers'])}")
+    print()
+
+    return pattern
+
+
+def write_svgs(
+    json_file: str,
+    outputs=OUTPUTS,
+    debug: bool = False,
+    precision=None,
+    pack_paths: bool = False,
+    output_dir: str = "",
+):
+    """
+    Render SVGs from a pattern JSON file and write them as pattern_<output>.svg.
+
+    Returns:
+        List of the SVG file paths written
+    """
+    print("Generating SVG files...")
+    svg_content = create_pattern(
+        json_file,
+        debug=debug,
+        outputs=outputs,
+        precision=precision,
+        pack_paths=pack_paths,
+    )
+
+    svg_files = []
+    for output in svg_content:
+        # Render before opening so a failure leaves the previous file intact
+        svg = svg_content[output]
+
+        svg_file = os.path.join(output_dir, f"pattern_{output}.svg")
+        with open(svg_file, "w") as f:
+            f.write(svg)
+        svg_files.append(svg_file)
+
+    names = [os.path.basename(svg_file) for svg_file in svg_files]
+    print(f"Generated SVG patterns: {', '.join(names)}")
+    if debug:
+        print("Debug mode enabled - SVGs include grid and ID numbers")
+
+    return svg_files
+
+
 def main():
     """Generate JSON pattern and SVG files."""
     parser = argparse.ArgumentParser(description="Generate pattern JSON and SVG files")
@@ -460,6 +645,15 @@ def main():
     parser.add_argument(
         "-s", "--seed", type=int, help="Random seed for reproducible patterns"
     )
+    parser.add_argument(
+        "--row-table",
+        action="store_true",
+        help="Sample whole rows from the precomputed row table",
+    )
+    parser.add_argument(
+        "--index",
+        help="Fingerprint index file used to skip patterns generated before",
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
@@ -480,68 +674,99 @@ def main():
         choices=["color1", "color2", "combined"],
         help="Send specified SVG to the plotter after generation",
     )
+    parser.add_argument(
+        "--precision",
+        type=int,
+        help="Decimal places to round SVG coordinates to (default: full precision)",
+    )
+    parser.add_argument(
+        "--pack-paths",
+        action="store_true",
+        help="Write each block's pipes as compact <path> data instead of polylines",
+    )
+    parser.add_argument(
+        "--outputs",
+        nargs="+",
+        choices=OUTPUTS,
+        help="SVGs to generate (default: all, or only the --plot layer)",
+    )
+    parser.add_argument(
+        "--worker",
+        metavar="SOCKET",
+        help="Generate and render in the warm worker listening on SOCKET",
+    )
 
     args = parser.parse_args()
 
-    import random
+    if args.precision is not None and args.precision < 0:
+        parser.error("--precision must be 0 or more")
+
+    outputs = args.outputs
+    if outputs is None:
+        # A plot run only needs the layer being plotted
+        outputs = [args.plot] if args.plot else ["combined", "color1", "color2"]
+    elif args.plot and args.plot not in outputs:
+        # Always render the layer being plotted so a stale file is never sent
+        outputs = outputs + [args.plot]
+
+    if args.worker:
+        # Hand the work to a warm worker process instead of doing it here
+        import worker
+
+        index_file = os.path.abspath(args.index) if args.index else None
+
+        try:
+            if not args.skip_json:
+                worker.send_command(
+                    args.worker,
+                    {
+                        "command": "generate",
+                        "json_file": os.path.abspath(args.json_file),
+                        "seed": args.seed,
+                        "use_row_table": args.row_table,
+                        "index_file": index_file,
+                    },
+                )
+            worker.send_command(
+                args.worker,
+                {
+                    "command": "render",
+                    "json_file": os.path.abspath(args.json_file),
+                    "outputs": outputs,
+                    "debug": args.debug,
+                    "precision": args.precision,
+                    "pack_paths": args.pack_paths,
+                    "output_dir": os.getcwd(),
+                },
+            )
+        except (ConnectionError, FileNotFoundError) as e:
+            parser.exit(1, f"Worker not running on {args.worker}: {e}\n")
+        except RuntimeError as e:
+            parser.exit(1, f"{e}\n")
+    else:
+        # Generate JSON pattern (unless skipped)
+        if not args.skip_json:
+            generate_json_file(
+                args.json_file,
+                seed=args.seed,
+                use_row_table=args.row_table,
+                index_file=args.index,
+            )
 
-    # Generate JSON pattern (unless skipped)
-    if not args.skip_json:
-        # Set random seed if provided
-        if args.seed is not None:
-            random.seed(args.seed)
-
-        # Generate the pattern
-        print("Generating JSON pattern...")
-        pattern = generate_json.generate_pattern()
-
-        # Save to file
-        with open(args.json_file, "w") as f:
-            json.dump(pattern, f, indent=2)
-
-        # Count statistics
-        total_blocks = 0
-        purple_count = 0
-        cyan_count = 0
-
-        for layer in pattern["layers"]:
-            for row in layer["rows"]:
-                for block in row["blocks"]:
-                    total_blocks += 1
-                    if block["color"] == "purple":
-                        purple_count += 1
-                    else:
-                        cyan_count += 1
-
-        print(f"Generated pattern saved to {args.json_file}")
-        print(f"Total blocks: {total_blocks}")
-        print(
-            f"Purple blocks: {purple_count} ({purple_count / total_blocks * 100:.1f}%)"
+        # Generate SVG patterns from JSON
+        write_svgs(
+            args.json_file,
+            outputs=outputs,
+            debug=args.debug,
+            precision=args.precision,
+            pack_paths=args.pack_paths,
         )
-        print(f"Cyan blocks: {cyan_count} ({cyan_count / total_blocks * 100:.1f}%)")
-        print(f"Layers: {len(pattern['layers'])}")
-        print()
-
-    # Generate SVG patterns from JSON
-    print("Generating SVG files...")
-    svg_content = create_pattern(args.json_file, debug=args.debug)
-
-    with open("pattern_combined.svg", "w") as f:
-        f.write(svg_content["combined"])
-    with open("pattern_color1.svg", "w") as f:
-        f.write(svg_content["color1"])
-    with open("pattern_color2.svg", "w") as f:
-        f.write(svg_content["color2"])
-
-    print(
-        f"Generated SVG patterns: pattern_combined.svg, pattern_color1.svg, pattern_color2.svg"
-    )
-    if args.debug:
-        print("Debug mode enabled - SVGs include grid and ID numbers")
 
     # Send to plotter if requested
     if args.plot:
-        if not PLOT_AVAILABLE:
+        try:
+            import plot
+        except ImportError:
             print("\nWarning: Cannot send to plotter - axidraw module not installed")
             print("Install with: pip install pyaxidraw")
         else:
@@ -552,6 +777,8 @@ def main():
                 print(f"Successfully sent {svg_file} to plotter")
             except Exception as e:
                 print(f"Error sending to plotter: {e}")
+                if plot.load_checkpoint(plot.checkpoint_path(svg_file)) is not None:
+                    print(f"Resume with: python plot.py {svg_file} --resume")
 
 
 if __name__ == "__main__":
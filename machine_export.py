@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Export pattern layers as G-code or HPGL for other pen plotters.
+
+The pipe polylines are computed straight from the pattern JSON with the
+same geometry as the SVGs, and written out one stroke at a time, so large
+patterns export in constant memory. Each colour layer goes to its own
+file: pattern_color1.gcode for purple and pattern_color2.gcode for cyan.
+
+Only the coloured pipes are drawn, the white pipes between them are the
+paper. Strokes are clipped to the area inside the SVG's white border.
+Masks can't be expressed as strokes, so the cyan layer is not clipped
+where it passes under purple the way the color2 SVG is.
+"""
+import argparse
+import json
+
+import generate_pattern
+
+# Millimetres per SVG user unit (px)
+MM_PER_UNIT = 25.4 / 96
+
+# Size of the units each format is written in, in millimetres
+UNIT_SIZES = {"mm": 1, "in": 25.4}
+HPGL_UNITS_PER_MM = 40
+
+# Default G-code drawing speed in mm per minute, converted to the output units
+DEFAULT_FEED_RATE = 1500
+
+FORMATS = {"gcode": ".gcode", "hpgl": ".hpgl"}
+
+# Width of the white border drawn over the edge of the SVGs, in user units
+BORDER_WIDTH = 20
+
+
+def clip_polyline(points, x_min, y_min, x_max, y_max):
+    """
+    Clip a polyline to a rectangle.
+
+    Yields:
+        The parts of the polyline inside the rectangle, as point lists
+    """
+    current = []
+
+    for start, end in zip(points, points[1:]):
+        # Liang-Barsky: find the part of the segment inside every edge
+        dx, dy = end[0] - start[0], end[1] - start[1]
+        t_enter, t_exit = 0.0, 1.0
+
+        for p, q in (
+            (-dx, start[0] - x_min),
+            (dx, x_max - start[0]),
+            (-dy, start[1] - y_min),
+            (dy, y_max - start[1]),
+        ):
+            if p == 0:
+                if q < 0:
+                    t_enter, t_exit = 1.0, 0.0
+            elif p < 0:
+                t_enter = max(t_enter, q / p)
+            else:
+                t_exit = min(t_exit, q / p)
+
+        if t_enter > t_exit:
+            # Segment is outside, finish any part already collected
+            if current:
+                yield current
+                current = []
+            continue
+
+        clipped_start = (start[0] + t_enter * dx, start[1] + t_enter * dy)
+        clipped_end = (start[0] + t_exit * dx, start[1] + t_exit * dy)
+
+        if current and t_enter > 0:
+            yield current
+            current = []
+        if not current:
+            current = [clipped_start]
+        current.append(clipped_end)
+
+        if t_exit < 1:
+            yield current
+            current = []
+
+    if current:
+        yield current
+
+
+def iter_layer_polylines(data, color, units="mm", flip_y=True):
+    """
+    Yield the coloured pipe polylines of one colour, in drawing order.
+
+    Points are in the given units at the size the SVGs are drawn, with the
+    origin moved to the bottom left when flip_y is set as machines expect.
+    Every other pipe in a block is reversed so the pen zigzags between them
+    instead of travelling back to the same end each time.
+    """
+    scale = generate_pattern.scale
+    unit_scale = MM_PER_UNIT / UNIT_SIZES[units]
+    page_height = generate_pattern.height * unit_scale
+
+    # Visible area of the SVG inside the border
+    inset = BORDER_WIDTH / 2
+    bounds = (
+        inset,
+        inset,
+        generate_pattern.width - inset,
+        generate_pattern.height - inset,
+    )
+
+    pipes = 7
+    for block in generate_pattern.iter_blocks(data):
+        if block["color"] != color:
+            continue
+
+        # Even pipes carry the colour, odd ones are white
+        for stroke, pipe in enumerate(range(0, pipes, 2)):
+            points = generate_pattern.pipe_points(
+                block["x"], block["y"], block["segments"], pipe
+            )
+            if stroke % 2:
+                points.reverse()
+
+            points = [(x * scale, y * scale) for x, y in points]
+            for visible in clip_polyline(points, *bounds):
+                visible = [(x * unit_scale, y * unit_scale) for x, y in visible]
+                if flip_y:
+                    visible = [(x, page_height - y) for x, y in visible]
+
+                yield visible
+
+
+def write_gcode(
+    polylines,
+    f,
+    units="mm",
+    feed_rate=None,
+    travel_rate=None,
+    pen_up="G0 Z5",
+    pen_down="G0 Z0",
+    precision=3,
+):
+    """
+    Write polylines as G-code.
+
+    Args:
+        polylines: Iterable of point lists, already in the given units
+        f: File to write to
+        units: "mm" or "in"
+        feed_rate: Drawing speed in units per minute (default: 1500 mm/min
+            in the given units)
+        travel_rate: Pen up speed in units per minute (default: G0 rapid)
+        pen_up: Command that lifts the pen
+        pen_down: Command that lowers the pen
+        precision: Decimal places written for coordinates
+    """
+
+    if feed_rate is None:
+        feed_rate = DEFAULT_FEED_RATE / UNIT_SIZES[units]
+
+    def xy(point):
+        return f"X{point[0]:.{precision}f} Y{point[1]:.{precision}f}"
+
+    f.write("G21\n" if units == "mm" else "G20\n")
+    f.write("G90\n")
+    f.write(f"{pen_up}\n")
+
+    for points in polylines:
+        if len(points) < 2:
+            continue
+
+        # Travel to the start with the pen up
+        if travel_rate is None:
+            f.write(f"G0 {xy(points[0])}\n")
+        else:
+            f.write(f"G1 {xy(points[0])} F{travel_rate:g}\n")
+
+        f.write(f"{pen_down}\n")
+        f.write(f"G1 {xy(points[1])} F{feed_rate:g}\n")
+        for point in points[2:]:
+            f.write(f"G1 {xy(point)}\n")
+        f.write(f"{pen_up}\n")
+
+    f.write("G0 X0 Y0\n")
+    f.write("M2\n")
+
+
+def write_hpgl(polylines, f, units="mm", pen=1, velocity=None):
+    """
+    Write polylines as HPGL.
+
+    Args:
+        polylines: Iterable of point lists, already in the given units
+        f: File to write to
+        units: Units the points are in, "mm" or "in"
+        pen: Pen number to select
+        velocity: Pen speed in cm/s (default: the plotter's own)
+    """
+    plotter_units = UNIT_SIZES[units] * HPGL_UNITS_PER_MM
+
+    def xy(point):
+        x, y = (round(value * plotter_units) for value in point)
+        return f"{x},{y}"
+
+    f.write(f"IN;SP{pen};\n")
+    if velocity is not None:
+        f.write(f"VS{velocity:g};\n")
+
+    for points in polylines:
+        if len(points) < 2:
+            continue
+
+        f.write(f"PU{xy(points[0])};\n")
+        f.write(f"PD{','.join(xy(point) for point in points[1:])};\n")
+
+    f.write("PU;SP0;\n")
+
+
+def export_pattern(
+    data_file: str, file_format="gcode", prefix="pattern", units="mm", **options
+):
+    """
+    Export each colour layer of a pattern to its own machine file.
+
+    Extra options are passed on to write_gcode or write_hpgl.
+
+    Returns:
+        List of the files written
+    """
+    with open(data_file, "r") as f:
+        data = json.load(f)
+
+    writer = write_gcode if file_format == "gcode" else write_hpgl
+    files = []
+
+    for output, color in generate_pattern.OUTPUT_COLORS.items():
+        filename = f"{prefix}_{output}{FORMATS[file_format]}"
+        with open(filename, "w") as f:
+            writer(iter_layer_polylines(data, color, units), f, units=units, **options)
+        files.append(filename)
+
+    return files
+
+
+def main():
+    """Export a pattern JSON file to G-code or HPGL."""
+    parser = argparse.ArgumentParser(
+        description="Export pattern colour layers to G-code or HPGL"
+    )
+    parser.add_argument(
+        "json_file",
+        nargs="?",
+        default="pattern.json",
+        help="Pattern JSON file (default: pattern.json)",
+    )
+    parser.add_argument(
+        "-f", "--format", choices=FORMATS, default="gcode", help="Output format"
+    )
+    parser.add_argument(
+        "--prefix",
+        default="pattern",
+        help="Output file prefix, files are <prefix>_color1.<format> and so on",
+    )
+    parser.add_argument(
+        "--units", choices=UNIT_SIZES, default="mm", help="Units (default: mm)"
+    )
+    parser.add_argument(
+        "--feed-rate",
+        type=float,
+        help="G-code drawing speed in units per minute "
+        f"(default: {DEFAULT_FEED_RATE} mm/min, whatever the units)",
+    )
+    parser.add_argument(
+        "--travel-rate",
+        type=float,
+        help="G-code pen up speed in units per minute (default: G0 rapid moves)",
+    )
+    parser.add_argument(
+        "--pen-up", default="G0 Z5", help="G-code command to lift the pen"
+    )
+    parser.add_argument(
+        "--pen-down", default="G0 Z0", help="G-code command to lower the pen"
+    )
+    parser.add_argument("--pen", type=int, default=1, help="HPGL pen number")
+    parser.add_argument("--velocity", type=float, help="HPGL pen speed in cm/s")
+    args = parser.parse_args()
+
+    if args.format == "gcode":
+        options = {
+            "feed_rate": args.feed_rate,
+            "travel_rate": args.travel_rate,
+            "pen_up": args.pen_up,
+            "pen_down": args.pen_down,
+        }
+    else:
+        options = {"pen": args.pen, "velocity": args.velocity}
+
+    files = export_pattern(
+        args.json_file, args.format, prefix=args.prefix, units=args.units, **options
+    )
+    print(f"Exported {', '.join(files)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Compact encoding of pipe polylines for SVG output.
+
+The pipe geometry comes straight out of trig and carries 15+ significant
+digits per coordinate, far more than the plotter or a browser can resolve.
+These helpers quantize points to a fixed number of decimal places, drop
+points that no longer add anything, and build `<path d>` data using
+relative commands so several pipes can share one element.
+"""
+import math
+
+# Default number of decimal places kept when quantizing coordinates
+DEFAULT_PRECISION = 2
+
+
+def quantize(value, precision):
+    """Round a coordinate to the given number of decimal places."""
+    value = round(value, precision)
+
+    # Avoid "-0" and trailing ".0" for whole numbers
+    if value == int(value):
+        return int(value)
+
+    return value
+
+
+def format_number(value, precision):
+    """Format a quantized value as a short string without trailing zeros."""
+    text = f"{value:.{precision}f}"
+    if "." in text:
+        text = text.rstrip("0").rstrip(".")
+    if text == "-0":
+        text = "0"
+    return text
+
+
+def simplify_points(points, precision):
+    """
+    Quantize a polyline and remove redundant points.
+
+    Consecutive duplicates are dropped, as are points lying on the straight
+    line between their neighbours. A point where the line doubles back on
+    itself is kept, as removing it would change the drawing.
+    """
+    simplified = []
+
+    for x, y in points:
+        point = (quantize(x, precision), quantize(y, precision))
+
+        # Skip duplicates of the previous point
+        if simplified and point == simplified[-1]:
+            continue
+
+        # Drop the previous point if it sits between its neighbours
+        if len(simplified) >= 2:
+            (ax, ay), (bx, by) = simplified[-2], simplified[-1]
+            cross = (bx - ax) * (point[1] - by) - (by - ay) * (point[0] - bx)
+            dot = (bx - ax) * (point[0] - bx) + (by - ay) * (point[1] - by)
+
+            # Distance of the previous point from the line, within one step
+            # of the quantization it can't be told apart from the line
+            if dot > 0:
+                distance = abs(cross) / math.dist((ax, ay), point)
+                if distance <= 10**-precision:
+                    simplified.pop()
+
+        simplified.append(point)
+
+    return simplified
+
+
+def path_data(paths, precision=DEFAULT_PRECISION):
+    """
+    Encode a list of polylines as a single SVG path `d` attribute.
+
+    The first point is absolute, every other point is relative to the one
+    before it, including the start of each following subpath. Deltas are
+    taken between quantized points so rounding errors never accumulate.
+    """
+    if precision is None:
+        precision = DEFAULT_PRECISION
+
+    commands = []
+    current = (0, 0)
+
+    for points in paths:
+        points = simplify_points(points, precision)
+        if len(points) < 2:
+            continue
+
+        start = points[0]
+        if commands:
+            command = "m"
+            dx, dy = start[0] - current[0], start[1] - current[1]
+        else:
+            command = "M"
+            dx, dy = start
+        commands.append(
+            f"{command}{format_number(dx, precision)} {format_number(dy, precision)}"
+        )
+
+        deltas = []
+        for previous, point in zip(points, points[1:]):
+            deltas.append(format_number(point[0] - previous[0], precision))
+            deltas.append(format_number(point[1] - previous[1], precision))
+        commands.append("l" + " ".join(deltas))
+
+        current = points[-1]
+
+    return "".join(commands)
@@ -1,8 +1,248 @@
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import re
+import tempfile
+
 from pyaxidraw import axidraw  # Import the module
 
+import svg_geometry
+
+# ad.errors.code values for a plotter that can't be reached or was unplugged
+AXIDRAW_CONNECT_FAILED = 101
+AXIDRAW_USB_LOST = 104
+
+
+def checkpoint_path(filename: str, port: str = None) -> str:
+    """
+    Return the checkpoint file used while plotting an SVG file.
+
+    Plots on a specific port get their own checkpoint, so the same file can
+    be plotted on several devices at once.
+    """
+    if port:
+        port_name = re.sub(r"[^\w.-]", "_", port)
+        return f"{filename}.{port_name}.checkpoint.json"
+    return f"{filename}.checkpoint.json"
+
+
+def file_hash(filename: str) -> str:
+    """Return a hex digest of a file's contents."""
+    with open(filename, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_checkpoint(path: str):
+    """Return the checkpoint saved at a path, or None if there isn't one."""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path: str, checkpoint):
+    """Save a checkpoint, replacing any previous one."""
+    # Write a unique temporary file then rename, so an interruption never
+    # leaves a partial checkpoint and concurrent plots can't collide
+    with tempfile.NamedTemporaryFile(
+        "w",
+        dir=os.path.dirname(path) or ".",
+        prefix=f"{os.path.basename(path)}.",
+        suffix=".tmp",
+        delete=False,
+    ) as f:
+        json.dump(checkpoint, f)
+    os.replace(f.name, path)
+
+
+def plot_svg(
+    filename: str,
+    port: str = None,
+    resume: bool = False,
+    start_index: int = None,
+    checkpoint_file: str = None,
+):
+    """
+    Plot an SVG file one polyline at a time, recording progress as it goes.
+
+    After each polyline a checkpoint with the index of the next polyline and
+    the pen position is saved to checkpoint_file (default: next to the SVG,
+    see checkpoint_path). If plotting stops part way, for a pen jam, a paper
+    shift or a lost connection, the checkpoint is kept so the plot can carry
+    on from there with resume, or from an explicit start_index. The
+    checkpoint is removed once the plot finishes.
+
+    SVGs with content svg_geometry can't follow, such as curves or rotated
+    groups, are plotted whole by the AxiDraw's own SVG plotting instead,
+    without checkpoints.
+
+    Raises:
+        ConnectionError: If the AxiDraw can't be reached or stops responding
+        ValueError: If resuming from a checkpoint saved for different file
+            contents, or resuming a file that can only be plotted whole
+    """
+    if checkpoint_file is None:
+        checkpoint_file = checkpoint_path(filename, port)
+
+    svg_hash = file_hash(filename)
+    try:
+        polylines = svg_geometry.svg_polylines(filename)
+    except svg_geometry.UnsupportedSVGError as e:
+        if resume or start_index is not None:
+            raise ValueError(f"{filename} can't be resumed: {e}") from e
+
+        print(f"{e}, plotting {filename} whole without checkpoints")
+        plot_whole_svg(filename, port)
+        return
+    inches = svg_geometry.inches_per_unit(filename)
+
+    start = 0
+    if start_index is not None:
+        start = start_index
+    elif resume:
+        checkpoint = load_checkpoint(checkpoint_file)
+        if checkpoint is not None:
+            if checkpoint.get("svg_hash") != svg_hash:
+                raise ValueError(
+                    f"{filename} has changed since {checkpoint_file} was saved, "
+                    "plot it again without resuming"
+                )
+            start = checkpoint["polyline"]
+
+    if not 0 <= start <= len(polylines):
+        raise ValueError(f"Start index {start} outside 0-{len(polylines)}")
+
+    if start:
+        print(f"Resuming {filename} at polyline {start} of {len(polylines)}")
 
-def plot_svg(filename: str):
     ad = axidraw.AxiDraw()  # connect to AxiDraw
-    ad.moveto(0, 0)  # Move to the origin to start clean
+    ad.interactive()
+    if port:
+        ad.options.port = port  # Use a specific AxiDraw when several are connected
+    if not ad.connect():
+        raise ConnectionError("Could not connect to AxiDraw")
+
+    try:
+        _send(ad.moveto, 0, 0)  # Move to the origin to start clean
+
+        for index in range(start, len(polylines)):
+            points = [(x * inches, y * inches) for x, y in polylines[index]]
+            if len(points) > 1:
+                _send(ad.moveto, *points[0])
+                for point in points[1:]:
+                    _send(ad.lineto, *point)
+
+            save_checkpoint(
+                checkpoint_file,
+                {
+                    "svg_file": filename,
+                    "svg_hash": svg_hash,
+                    "polyline": index + 1,
+                    "position": points[-1] if points else None,
+                },
+            )
+
+        _send(ad.moveto, 0, 0)
+    finally:
+        ad.penup()
+        ad.disconnect()
+
+    # The whole file has been plotted, nothing left to resume
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(checkpoint_file)
+
+
+def plot_whole_svg(filename: str, port: str = None):
+    """
+    Plot an SVG file in one go with the AxiDraw's own SVG plotting.
+
+    Raises:
+        ConnectionError: If the AxiDraw can't be reached or is disconnected
+            part way
+    """
+    ad = axidraw.AxiDraw()
     ad.plot_setup(filename)  # Load the SVG file
-    ad.plot_run()  # Plot the SVG file
+    if port:
+        ad.options.port = port
+    _send(ad.plot_run)  # Plot the SVG file
+
+    if ad.errors.code in (AXIDRAW_CONNECT_FAILED, AXIDRAW_USB_LOST):
+        raise ConnectionError(f"AxiDraw connection failed (error {ad.errors.code})")
+
+
+def preview_time(filename: str) -> float:
+    """Return the AxiDraw's own estimate of the seconds an SVG takes to plot."""
+    ad = axidraw.AxiDraw()
+    ad.plot_setup(filename)
+    ad.options.preview = True
+    ad.options.report_time = True
+    ad.plot_run()
+    return ad.time_estimate
+
+
+def _send(command, *args):
+    """
+    Run an AxiDraw command, reporting serial I/O failures as ConnectionError
+    so they can be told apart from problems with the file or checkpoint.
+    """
+    try:
+        command(*args)
+    except OSError as e:
+        raise ConnectionError(f"Lost connection to AxiDraw: {e}") from e
+
+
+def list_ports():
+    """Return the names or ports of all connected AxiDraw devices."""
+    ad = axidraw.AxiDraw()
+    ad.plot_setup()
+    ad.options.mode = "manual"
+    ad.options.manual_cmd = "list_names"
+    ad.plot_run()
+    return list(ad.name_list or [])
+
+
+def main():
+    """Plot an SVG file, optionally resuming an interrupted plot."""
+    parser = argparse.ArgumentParser(description="Plot an SVG file on the AxiDraw")
+    parser.add_argument("svg_file", help="SVG file to plot")
+    parser.add_argument("--port", help="AxiDraw port or name to use")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from the last checkpoint of an interrupted plot",
+    )
+    parser.add_argument(
+        "--start",
+        type=int,
+        metavar="INDEX",
+        help="Start plotting from this polyline index",
+    )
+    args = parser.parse_args()
+
+    try:
+        plot_svg(
+            args.svg_file, port=args.port, resume=args.resume, start_index=args.start
+        )
+    except ValueError as e:
+        # Nothing was plotted, so there is no progress to report
+        print(f"Plot stopped: {e}")
+        return
+    except (Exception, KeyboardInterrupt) as e:
+        checkpoint = load_checkpoint(checkpoint_path(args.svg_file, args.port))
+        print(f"Plot stopped: {e}")
+        if checkpoint is not None:
+            port_option = f" --port {args.port}" if args.port else ""
+            print(
+                f"Completed {checkpoint['polyline']} polylines, resume with: "
+                f"python plot.py {args.svg_file}{port_option} --resume"
+            )
+        return
+
+    print(f"Successfully plotted {args.svg_file}")
+
+
+if __name__ == "__main__":
+    main()
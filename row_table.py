@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Precomputed table of every row the pattern rules can produce.
+
+generate_json builds a row one choice at a time and then patches the
+result: a block after a northeast block is forced northeast, a row with a
+single block has a single segment, and the last northeast segment of a row
+is stretched to 560. Here those rules are applied once to enumerate every
+distinct row shape, with its exact probability and each block's offset
+from the row start. Colours are independent of the shape and are left out
+of the table.
+
+Rows are then drawn in O(1) with an alias table, and the design space can
+be counted or enumerated directly. Building the table takes about half a
+second, so it is pickled next to this module and loaded from there by later
+processes until the rule constants change.
+"""
+import argparse
+import functools
+import hashlib
+import itertools
+import os
+import pickle
+import random
+import tempfile
+
+import generate_json
+
+# Pickled table, reused while the rule constants stay the same
+CACHE_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), ".row_table.pickle"
+)
+
+# Bump when the way rows are built changes without any constant changing
+CACHE_VERSION = 2
+
+
+def _normalize(weights):
+    total = sum(weights.values())
+    return [(key, weight / total) for key, weight in weights.items()]
+
+
+@functools.lru_cache(maxsize=None)
+def _segment_lengths(direction, num_segments, is_last_block):
+    """Distribution of the segment lengths of one block."""
+    lengths = {}
+
+    for choice in itertools.product(
+        _normalize(generate_json.SEGMENT_LENGTHS_WEIGHTS), repeat=num_segments
+    ):
+        probability = 1.0
+        block_lengths = []
+        segment_direction = direction
+
+        for i, (length, length_probability) in enumerate(choice):
+            probability *= length_probability
+
+            # The last northeast segment of the row runs to the edge
+            if (
+                is_last_block
+                and i == num_segments - 1
+                and segment_direction == "northeast"
+            ):
+                length = 560
+            block_lengths.append(length)
+
+            segment_direction = (
+                "southeast" if segment_direction == "northeast" else "northeast"
+            )
+
+        key = tuple(block_lengths)
+        lengths[key] = lengths.get(key, 0) + probability
+
+    return list(lengths.items())
+
+
+def _block_segments(direction, lengths):
+    """Expand a block's first direction and lengths into segment dictionaries."""
+    segments = []
+    for length in lengths:
+        segments.append({"direction": direction, "length": length})
+        direction = "southeast" if direction == "northeast" else "northeast"
+    return segments
+
+
+def _block_choices(num_blocks, index, previous):
+    """Distribution of (direction, lengths) for one block of a row."""
+    if num_blocks == 1 or (previous is not None and previous[0] == "northeast"):
+        directions = [("northeast", 1.0)]
+    else:
+        directions = _normalize(generate_json.DIRECTIONS_WEIGHTS)
+
+    # A block on its own in a row has a single segment
+    if num_blocks == 1:
+        segment_counts = [(1, 1.0)]
+    else:
+        segment_counts = _normalize(generate_json.SEGMENT_WEIGHTINGS)
+
+    is_last_block = index == num_blocks - 1
+
+    for direction, direction_probability in directions:
+        for num_segments, count_probability in segment_counts:
+            for lengths, length_probability in _segment_lengths(
+                direction, num_segments, is_last_block
+            ):
+                probability = direction_probability * count_probability
+                yield direction, lengths, probability * length_probability
+
+
+def iter_row_shapes():
+    """
+    Enumerate every distinct row shape.
+
+    Yields:
+        (blocks, probability) where blocks is a tuple of
+        (direction, segment lengths, x offset, y offset) for each block
+    """
+    for num_blocks, block_probability in _normalize(generate_json.BLOCK_WEIGHTINGS):
+        rows = {(): block_probability}
+
+        for index in range(num_blocks):
+            extended = {}
+
+            for row, probability in rows.items():
+                previous = row[-1] if row else None
+
+                for direction, lengths, choice_probability in _block_choices(
+                    num_blocks, index, previous
+                ):
+                    x, y = 0, 0
+                    if previous is not None:
+                        x_change, y_change = generate_json.block_offset(
+                            _block_segments(previous[0], previous[1]), direction
+                        )
+                        x, y = previous[2] + x_change, previous[3] + y_change
+
+                    key = row + ((direction, lengths, x, y),)
+                    extended[key] = (
+                        extended.get(key, 0) + probability * choice_probability
+                    )
+
+            rows = extended
+
+        yield from rows.items()
+
+
+class RowTable:
+    """
+    All row shapes with an alias table for constant time sampling.
+
+    Pass the dictionary from a previous table's state() to restore it
+    without enumerating the rows again.
+    """
+
+    def __init__(self, state=None):
+        if state is not None:
+            self.rows = state["rows"]
+            self.probabilities = state["probabilities"]
+            self._accept = state["accept"]
+            self._alias = state["alias"]
+            return
+
+        self.rows = []
+        self.probabilities = []
+
+        # Rows share a few hundred distinct blocks, keeping one copy of each
+        # saves memory and makes the pickled table much quicker to load
+        blocks = {}
+        for row, probability in iter_row_shapes():
+            self.rows.append(tuple(blocks.setdefault(block, block) for block in row))
+            self.probabilities.append(probability)
+
+        self._build_alias()
+
+    def _build_alias(self):
+        """Build Vose's alias table from the row probabilities."""
+        count = len(self.probabilities)
+        scaled = [probability * count for probability in self.probabilities]
+        self._accept = [1.0] * count
+        self._alias = list(range(count))
+
+        small = [i for i, value in enumerate(scaled) if value < 1]
+        large = [i for i, value in enumerate(scaled) if value >= 1]
+
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self._accept[less] = scaled[less]
+            self._alias[less] = more
+
+            scaled[more] -= 1 - scaled[less]
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def state(self):
+        """Return the table as plain lists, for caching."""
+        return {
+            "rows": self.rows,
+            "probabilities": self.probabilities,
+            "accept": self._accept,
+            "alias": self._alias,
+        }
+
+    def sample(self):
+        """Draw a row shape with its exact probability."""
+        index = random.randrange(len(self.rows))
+        if random.random() >= self._accept[index]:
+            index = self._alias[index]
+        return self.rows[index]
+
+    def count_rows(self, with_colors=True):
+        """Count the distinct rows, optionally counting each colouring."""
+        if not with_colors:
+            return len(self.rows)
+
+        num_colors = len(generate_json.COLORS_WEIGHTS)
+        return sum(num_colors ** len(row) for row in self.rows)
+
+    def count_patterns(self):
+        """Count the distinct patterns, a row choice for every row position."""
+        num_rows = len(list(generate_json.row_start_positions()))
+        return self.count_rows() ** num_rows
+
+
+def _cache_key() -> str:
+    """Return a hash of everything the row table is built from."""
+    constants = (
+        CACHE_VERSION,
+        generate_json.LENGTH_POSITION_CHANGES_NE,
+        generate_json.LENGTH_POSITION_CHANGES_SE,
+        generate_json.DIRECTIONS_WEIGHTS,
+        generate_json.BLOCK_WEIGHTINGS,
+        generate_json.SEGMENT_WEIGHTINGS,
+        generate_json.SEGMENT_LENGTHS_WEIGHTS,
+    )
+    return hashlib.sha256(repr(constants).encode()).hexdigest()
+
+
+def _load_cached_table(key: str):
+    """Return the cached row table for a key, or None if there isn't one."""
+    try:
+        with open(CACHE_FILE, "rb") as f:
+            cached = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError, ValueError, IndexError):
+        # A missing or corrupt cache is rebuilt
+        return None
+
+    if not isinstance(cached, dict) or cached.get("key") != key:
+        return None
+
+    return RowTable(cached)
+
+
+def _save_cached_table(key: str, table):
+    """Cache a row table, ignoring failures such as a read-only directory."""
+    try:
+        # Write a unique temporary file then rename, so processes building
+        # the table at the same time never read a partial cache
+        with tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(CACHE_FILE),
+            prefix=f"{os.path.basename(CACHE_FILE)}.",
+            suffix=".tmp",
+            delete=False,
+        ) as f:
+            # Only plain lists and tuples are stored, so the cache loads the
+            # same whichever module built it, including row_table run as
+            # __main__
+            pickle.dump(
+                {"key": key, **table.state()}, f, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        os.replace(f.name, CACHE_FILE)
+    except OSError:
+        pass
+
+
+@functools.lru_cache(maxsize=None)
+def get_row_table():
+    """Return the shared row table, loading or building it on first use."""
+    key = _cache_key()
+    table = _load_cached_table(key)
+    if table is None:
+        table = RowTable()
+        _save_cached_table(key, table)
+    return table
+
+
+def generate_row_blocks(start_x, start_y, block_id_counter):
+    """Generate blocks for a single row by sampling the row table."""
+    blocks = []
+
+    for direction, lengths, x, y in get_row_table().sample():
+        blocks.append(
+            {
+                "id": block_id_counter,
+                "segments": _block_segments(direction, lengths),
+                "color": generate_json.weighted_choice(
+                    generate_json.COLORS_WEIGHTS
+                ),
+                "x": start_x + x,
+                "y": start_y + y,
+            }
+        )
+        block_id_counter += 1
+
+    return blocks, block_id_counter
+
+
+def main():
+    """Print the size of the pattern design space."""
+    parser = argparse.ArgumentParser(
+        description="Count the rows and patterns the rules can produce"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=0,
+        help="Also list the N most likely row shapes",
+    )
+    args = parser.parse_args()
+
+    table = get_row_table()
+    num_rows = len(list(generate_json.row_start_positions()))
+
+    print(f"Row shapes: {table.count_rows(with_colors=False)}")
+    print(f"Rows including colours: {table.count_rows()}")
+    print(f"Rows per pattern: {num_rows}")
+    print(f"Patterns: {table.count_patterns():.3e}")
+
+    ranked = sorted(
+        zip(table.rows, table.probabilities), key=lambda item: item[1], reverse=True
+    )
+    for row, probability in ranked[: args.top]:
+        blocks = ", ".join(
+            f"{direction} {'/'.join(map(str, lengths))} @({x}, {y})"
+            for direction, lengths, x, y in row
+        )
+        print(f"{probability:.6f}  {blocks}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Read the stroked geometry back out of a generated SVG file.
+
+Only what generate_pattern writes is supported: polylines, polygons,
+lines, rectangles, circles, ellipses and paths made of M/m/L/l commands,
+inside groups using scale and translate transforms. Like the AxiDraw's own
+SVG plotting, every shape is traced as an outline whatever its fill or
+stroke colour. Definitions such as the cyan mask are never drawn and are
+skipped, and so is text. Anything else that changes the geometry, such as
+curves, rotations or <use> references, raises UnsupportedSVGError so the
+caller can hand the file to the AxiDraw's own SVG plotting instead.
+"""
+import math
+import re
+import xml.etree.ElementTree as ET
+
+# SVG user units (px) per inch, and per other absolute units
+UNITS_PER_INCH = {"": 96, "px": 96, "in": 1, "mm": 25.4, "cm": 2.54, "pt": 72}
+
+# Straight segments used to trace a circle or ellipse
+ELLIPSE_SEGMENTS = 64
+
+# Elements that draw geometry this module can't follow
+UNSUPPORTED_ELEMENTS = {"use", "svg", "image", "foreignObject"}
+
+
+class UnsupportedSVGError(ValueError):
+    """Raised when an SVG uses features that can't be read as polylines."""
+
+
+def svg_polylines(svg_file: str):
+    """Read the point lists of every drawn shape, in drawing order."""
+    root = ET.parse(svg_file).getroot()
+    view_box = _numbers(root.get("viewBox", ""))
+    if len(view_box) == 4 and (view_box[0] or view_box[1]):
+        raise UnsupportedSVGError("viewBox with an offset origin is not supported")
+
+    polylines = []
+    elements = [(root, (1, 0, 1, 0))]
+
+    while elements:
+        element, transform = elements.pop()
+        tag = element.tag.rsplit("}", 1)[-1]
+
+        # Skip mask and other definitions, they are never drawn
+        if tag == "defs":
+            continue
+        if tag in UNSUPPORTED_ELEMENTS and element is not root:
+            raise UnsupportedSVGError(f"<{tag}> elements are not supported")
+
+        transform = _compose(transform, element.get("transform", ""))
+
+        if tag == "path":
+            for points in _path_polylines(element.get("d", "")):
+                polylines.append(_apply(transform, points))
+        else:
+            points = _shape_points(tag, element)
+            if points:
+                polylines.append(_apply(transform, points))
+
+        # Visit children in document order
+        elements.extend((child, transform) for child in reversed(list(element)))
+
+    return polylines
+
+
+def inches_per_unit(svg_file: str) -> float:
+    """Return the size in inches of one user unit of an SVG document."""
+    root = ET.parse(svg_file).getroot()
+    match = re.fullmatch(r"([\d.]+)\s*([a-z]*)", root.get("width", "").strip())
+    if not match or match.group(2) not in UNITS_PER_INCH:
+        return 1 / UNITS_PER_INCH["px"]
+
+    width_inches = float(match.group(1)) / UNITS_PER_INCH[match.group(2)]
+
+    # A viewBox maps its own width onto the document width
+    view_box = _numbers(root.get("viewBox", ""))
+    if len(view_box) == 4 and view_box[2]:
+        return width_inches / view_box[2]
+
+    return width_inches / float(match.group(1))
+
+
+def _numbers(text: str):
+    """Parse a whitespace or comma separated list of numbers."""
+    return [float(n) for n in re.split(r"[\s,]+", text.strip()) if n]
+
+
+def _compose(transform, text: str):
+    """Apply the scale and translate operations in a transform attribute."""
+    scale_x, offset_x, scale_y, offset_y = transform
+
+    for operation in re.findall(r"([A-Za-z]+)\s*\(", text):
+        if operation not in ("scale", "translate"):
+            raise UnsupportedSVGError(f"{operation} transforms are not supported")
+
+    for operation, args in re.findall(r"(scale|translate)\s*\(([^)]*)\)", text):
+        values = _numbers(args)
+        if operation == "scale":
+            sx = values[0]
+            sy = values[1] if len(values) > 1 else sx
+            scale_x, scale_y = scale_x * sx, scale_y * sy
+        else:
+            tx = values[0]
+            ty = values[1] if len(values) > 1 else 0
+            offset_x, offset_y = offset_x + scale_x * tx, offset_y + scale_y * ty
+
+    return scale_x, offset_x, scale_y, offset_y
+
+
+def _apply(transform, points):
+    scale_x, offset_x, scale_y, offset_y = transform
+    return [(x * scale_x + offset_x, y * scale_y + offset_y) for x, y in points]
+
+
+def _shape_points(tag: str, element):
+    """Return the outline of a basic shape element, or None for other tags."""
+
+    def number(name):
+        return float(element.get(name, 0))
+
+    if tag in ("polyline", "polygon"):
+        numbers = _numbers(element.get("points", ""))
+        points = list(zip(numbers[::2], numbers[1::2]))
+        if tag == "polygon" and points:
+            points.append(points[0])
+        return points
+
+    if tag == "line":
+        return [(number("x1"), number("y1")), (number("x2"), number("y2"))]
+
+    if tag == "rect":
+        x, y = number("x"), number("y")
+        width, height = number("width"), number("height")
+        return [
+            (x, y),
+            (x + width, y),
+            (x + width, y + height),
+            (x, y + height),
+            (x, y),
+        ]
+
+    if tag in ("circle", "ellipse"):
+        cx, cy = number("cx"), number("cy")
+        if tag == "circle":
+            rx = ry = number("r")
+        else:
+            rx, ry = number("rx"), number("ry")
+        return [
+            (
+                cx + rx * math.cos(2 * math.pi * i / ELLIPSE_SEGMENTS),
+                cy + ry * math.sin(2 * math.pi * i / ELLIPSE_SEGMENTS),
+            )
+            for i in range(ELLIPSE_SEGMENTS + 1)
+        ]
+
+    return None
+
+
+def _path_polylines(d: str):
+    """Split path data made of M/m/L/l commands into point lists."""
+    # Exponents aside, any other letter is a command that isn't handled
+    unsupported = set(re.findall(r"[A-DF-Za-df-z]", d)) - set("MmLl")
+    if unsupported:
+        commands = "".join(sorted(unsupported))
+        raise UnsupportedSVGError(f"Path commands {commands} are not supported")
+
+    polylines = []
+    current = (0, 0)
+
+    for command, args in re.findall(r"([MmLl])([^MmLl]*)", d):
+        numbers = _numbers(args)
+        pairs = list(zip(numbers[::2], numbers[1::2]))
+
+        for index, (x, y) in enumerate(pairs):
+            if command in "ml":
+                x, y = current[0] + x, current[1] + y
+            current = (x, y)
+
+            # Points after the first in a move command are implicit line-tos
+            if command in "Mm" and index == 0:
+                polylines.append([current])
+            else:
+                polylines[-1].append(current)
+
+    return polylines
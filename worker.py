@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Warm worker that generates and renders patterns for short-lived clients.
+
+Starting a fresh interpreter and importing svgwrite for every visitor adds
+noticeable latency at the kiosk. The worker is started once, keeps
+everything imported, and accepts commands over a Unix socket:
+
+    python worker.py --socket /tmp/plotter.sock
+    python generate_pattern.py --worker /tmp/plotter.sock
+
+Each connection carries one JSON command line and receives one JSON
+response line. Commands are run one at a time as generation seeds the
+shared random module.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+
+COMMANDS = ("ping", "generate", "render")
+
+
+def run_command(command):
+    """
+    Run a single worker command.
+
+    Returns:
+        Dictionary with "ok", any result fields, and "output" holding what
+        the command printed
+    """
+    import generate_pattern
+
+    name = command.get("command")
+    if name not in COMMANDS:
+        return {"ok": False, "error": f"Unknown command: {name}", "output": ""}
+
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            if name == "generate":
+                generate_pattern.generate_json_file(
+                    command["json_file"],
+                    seed=command.get("seed"),
+                    use_row_table=command.get("use_row_table", False),
+                    index_file=command.get("index_file"),
+                )
+                result = {"json_file": command["json_file"]}
+            elif name == "render":
+                svg_files = generate_pattern.write_svgs(
+                    command["json_file"],
+                    outputs=command.get("outputs") or generate_pattern.OUTPUTS,
+                    debug=command.get("debug", False),
+                    precision=command.get("precision"),
+                    pack_paths=command.get("pack_paths", False),
+                    output_dir=command.get("output_dir", ""),
+                )
+                result = {"svg_files": svg_files}
+            else:
+                result = {}
+    except Exception as e:
+        return {"ok": False, "error": str(e), "output": output.getvalue()}
+
+    return {"ok": True, **result, "output": output.getvalue()}
+
+
+class WorkerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        try:
+            command = json.loads(self.rfile.readline())
+            if not isinstance(command, dict):
+                raise ValueError("command must be a JSON object")
+        except ValueError as e:
+            response = {"ok": False, "error": f"Invalid command: {e}", "output": ""}
+        else:
+            response = run_command(command)
+
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+def serve(socket_path: str):
+    """Listen for commands on a Unix socket until interrupted."""
+    # Load the rendering code and row table now rather than on the first visitor
+    import generate_pattern  # noqa: F401
+    import row_table
+    import svgwrite  # noqa: F401
+
+    row_table.get_row_table()
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    with socketserver.UnixStreamServer(socket_path, WorkerHandler) as server:
+        print(f"Worker listening on {socket_path}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
+
+
+def send_command(socket_path: str, command) -> dict:
+    """
+    Send a command to a running worker, print its output and return the
+    response.
+
+    Raises:
+        RuntimeError: If the worker reports that the command failed or
+            closes the connection without replying
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(json.dumps(command).encode() + b"\n")
+        with client.makefile("rb") as f:
+            line = f.readline()
+
+    if not line:
+        raise RuntimeError("Worker error: connection closed without a response")
+    response = json.loads(line)
+
+    print(response.get("output", ""), end="")
+    if not response["ok"]:
+        raise RuntimeError(f"Worker error: {response['error']}")
+
+    return response
+
+
+def main():
+    """Run the warm worker."""
+    parser = argparse.ArgumentParser(
+        description="Keep a warm process for generating and rendering patterns"
+    )
+    parser.add_argument(
+        "--socket",
+        default="/tmp/hashiconf-plotter.sock",
+        help="Unix socket path to listen on (default: /tmp/hashiconf-plotter.sock)",
+    )
+    args = parser.parse_args()
+
+    serve(args.socket)
+
+
+if __name__ == "__main__":
+    main()